@@ -6,25 +6,46 @@ Custom Prometheus exporter for:
 - Weather (Open-Meteo)
 - FX rates USD/EUR -> KZT (Frankfurter + exchangerate.host fallback)
 - GitHub repo stats (stars, forks, open issues)
+- CS:GO domain metrics from Postgres (csgo_collector.py, when CSGO_DATABASE_URL is set)
 
-Metrics are exposed on /metrics (default port 8000).
-Update interval defaults to 20 seconds.
+Metrics are exposed on /metrics (default port 8000), together with the
+exporter's own latency / fallback / cycle metrics and the default process
+collector (CPU, RSS, fds); /debug returns the most recent fetch timings as JSON.
+Every source runs in its own thread with its own interval, timeout and
+keep-alive HTTP session, so a slow or dead source never delays the others.
+FX and GitHub keep their last good values (with an age gauge) instead of
+dropping to 0; FX USD/EUR are fetched in parallel and hedged across
+providers; GitHub uses ETag conditional requests (304s are free).
 
 Environment overrides (optional):
   PORT=8000
-  LOOP_SECONDS=20
+  LOOP_SECONDS=20                   (default interval for every source)
+  WEATHER_SECONDS / FX_SECONDS / GITHUB_SECONDS      (per-source interval)
+  WEATHER_TIMEOUT / FX_TIMEOUT / GITHUB_TIMEOUT      (per-request timeout, s)
+  FX_HEDGE_SECONDS=1.5              (race the FX fallbacks if the primary is slower)
+  DEBUG_HISTORY=200                 (fetches kept for /debug)
   CITY_LAT=51.1694
   CITY_LON=71.4491
   GITHUB_REPO=torvalds/linux        (format: owner/repo)
+  OPENMETEO_URL / ERAPI_URL / JSDELIVR_URL / EXCHANGERATE_HOST_URL / GITHUB_API_URL
+                                    (base URLs, e.g. a local stub server in tests)
 """
 
 import os
+import json
 import time
 import logging
-from typing import Tuple
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Tuple
 
 import requests
-from prometheus_client import Gauge, start_http_server
+from requests.adapters import HTTPAdapter
+from csgo_collector import collector_from_env
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, Summary, generate_latest
 
 # -----------------------------
 # Configuration (env overrides)
@@ -39,6 +60,23 @@ GITHUB_REPO = os.getenv("GITHUB_REPO", "torvalds/linux")  # owner/name
 
 HTTP_TIMEOUT = 8  # seconds for outbound API calls
 
+WEATHER_SECONDS = float(os.getenv("WEATHER_SECONDS", LOOP_SECONDS))
+FX_SECONDS = float(os.getenv("FX_SECONDS", LOOP_SECONDS))
+GITHUB_SECONDS = float(os.getenv("GITHUB_SECONDS", LOOP_SECONDS))
+
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", HTTP_TIMEOUT))
+FX_TIMEOUT = float(os.getenv("FX_TIMEOUT", HTTP_TIMEOUT))
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", HTTP_TIMEOUT))
+
+FX_HEDGE_SECONDS = float(os.getenv("FX_HEDGE_SECONDS", "1.5"))
+DEBUG_HISTORY = int(os.getenv("DEBUG_HISTORY", "200"))
+
+OPENMETEO_URL = os.getenv("OPENMETEO_URL", "https://api.open-meteo.com")
+ERAPI_URL = os.getenv("ERAPI_URL", "https://open.er-api.com")
+JSDELIVR_URL = os.getenv("JSDELIVR_URL", "https://cdn.jsdelivr.net")
+EXCHANGERATE_HOST_URL = os.getenv("EXCHANGERATE_HOST_URL", "https://api.exchangerate.host")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
 # ------------
 # Logging
 # ------------
@@ -62,30 +100,105 @@ g_openmeteo_up = Gauge("openmeteo_api_up", "Open-Meteo reachable (1/0)")
 g_fx_usd_kzt = Gauge("fx_usd_kzt", "USD->KZT rate")
 g_fx_eur_kzt = Gauge("fx_eur_kzt", "EUR->KZT rate")
 g_fx_up = Gauge("fx_api_up", "FX API reachable (1/0)")
+g_fx_age = Gauge("fx_rates_age_seconds", "Age of the FX rates being served (-1 = never fetched)")
 
 # GitHub
 g_gh_stars = Gauge("github_repo_stars", "GitHub repo stars")
 g_gh_forks = Gauge("github_repo_forks", "GitHub repo forks")
 g_gh_open_issues = Gauge("github_repo_open_issues", "GitHub repo open issues")
 g_gh_up = Gauge("gh_api_up", "GitHub API reachable (1/0)")
+g_gh_age = Gauge("github_repo_stats_age_seconds", "Age of the GitHub stats being served (-1 = never fetched)")
+
+
+class LastGood:
+    """Last successful value of a source, served (with its age) while the source is failing."""
+
+    def __init__(self):
+        self.value, self.ts = None, None
+        self.lock = threading.Lock()
+
+    def put(self, value):
+        with self.lock:
+            self.value, self.ts = value, time.time()
+
+    def get(self):
+        with self.lock:
+            return self.value
+
+    def age(self) -> float:
+        with self.lock:
+            return time.time() - self.ts if self.ts else -1.0
+
+
+fx_last = LastGood()
+gh_last = LastGood()
+g_fx_age.set_function(fx_last.age)
+g_gh_age.set_function(gh_last.age)
+
+# Self-instrumentation (process_* CPU / memory come from the default ProcessCollector)
+h_fetch = Histogram("exporter_fetch_seconds", "Outbound HTTP request latency", ["source", "endpoint"],
+                    buckets=(.05, .1, .25, .5, 1, 2, 4, 8, 16))
+c_fetch = Counter("exporter_fetch_total", "Fetch attempts per provider", ["source", "provider", "outcome"])
+c_fx_selected = Counter("exporter_fx_provider_selected_total", "FX answers served, by winning provider", ["provider"])
+s_cycle = Summary("exporter_cycle_seconds", "Duration of one update cycle", ["source"])
+g_last_success = Gauge("exporter_last_success_timestamp_seconds", "Unix time of the last successful update", ["source"])
+
+# most recent fetches, newest last, served by /debug
+RECENT = deque(maxlen=DEBUG_HISTORY)
+
+
+def timed_get(http, source: str, endpoint: str, url: str, **kwargs):
+    """http.get with latency recorded under (source, endpoint) and in RECENT."""
+    t0 = time.perf_counter()
+    status, error = None, None
+    try:
+        r = http.get(url, **kwargs)
+        status = r.status_code
+        return r
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        dt = time.perf_counter() - t0
+        h_fetch.labels(source, endpoint).observe(dt)
+        RECENT.append({"ts": round(time.time(), 3), "source": source, "endpoint": endpoint,
+                       "status": status, "error": error, "ms": round(dt * 1000, 1)})
+
+
+# ----------------
+# HTTP sessions
+# ----------------
+def make_session(pool_size: int = 8) -> requests.Session:
+    """
+    Keep-alive session with its own connection pool, one per source (only
+    plain GETs without cookies are sent, so FX hedging may share it).
+    """
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers["User-Agent"] = "custom-exporter"
+    return s
 
 
 # ----------------
 # Helper fetchers
 # ----------------
-def fetch_weather(lat: float, lon: float) -> Tuple[float, float, float, bool]:
+def fetch_weather(lat: float, lon: float, session=None, timeout: float = HTTP_TIMEOUT) -> Tuple[float, float, float, bool]:
     """
     Returns (temp_c, windspeed_ms, winddir_deg, ok).
     """
+    http = session or requests
     try:
-        r = requests.get(
-            "https://api.open-meteo.com/v1/forecast",
+        r = timed_get(
+            http, "weather", "/v1/forecast",
+            f"{OPENMETEO_URL}/v1/forecast",
             params={
                 "latitude": lat,
                 "longitude": lon,
                 "current": "temperature_2m,wind_speed_10m,wind_direction_10m",
             },
-            timeout=HTTP_TIMEOUT,
+            timeout=timeout,
         )
         r.raise_for_status()
         j = r.json()
@@ -93,130 +206,295 @@ def fetch_weather(lat: float, lon: float) -> Tuple[float, float, float, bool]:
         temp_c = float(cur.get("temperature_2m"))
         windspeed = float(cur.get("wind_speed_10m"))
         winddir = float(cur.get("wind_direction_10m"))
+        c_fetch.labels("weather", "open-meteo", "ok").inc()
         return temp_c, windspeed, winddir, True
     except Exception as e:
+        c_fetch.labels("weather", "open-meteo", "error").inc()
         log.warning("[WEATHER] fetch failed: %s", e)
         return 0.0, 0.0, 0.0, False
 
 
-def fetch_fx_rates():
-    """
-    Returns (usd_kzt, eur_kzt, ok).
-    Primary: open.er-api.com (KZT supported)
-    Fallback: jsdelivr currency-api (daily JSON on GitHub)
-    Last resort: exchangerate.host (some networks return partial JSON)
-    """
-    import requests
+def _fx_erapi(http, base: str, timeout: float) -> float:
+    r = timed_get(http, "fx", "erapi", f"{ERAPI_URL}/v6/latest/{base}", timeout=timeout)
+    r.raise_for_status()
+    return float(r.json()["rates"]["KZT"])
 
-    # --- Primary: ERAPI (usually reliable) ---
-    try:
-        r = requests.get("https://open.er-api.com/v6/latest/USD", timeout=8)
-        r.raise_for_status()
-        usd_json = r.json()
-        usd_kzt = float(usd_json["rates"]["KZT"])
-
-        r2 = requests.get("https://open.er-api.com/v6/latest/EUR", timeout=8)
-        r2.raise_for_status()
-        eur_json = r2.json()
-        eur_kzt = float(eur_json["rates"]["KZT"])
-        return usd_kzt, eur_kzt, True
-    except Exception as e:
-        log.warning("[FX] ERAPI failed: %s", e)
 
-    # --- Fallback: jsdelivr (GitHub daily currency API) ---
-    try:
-        r = requests.get("https://cdn.jsdelivr.net/gh/fawazahmed0/currency-api@1/latest/currencies/usd/kzt.json", timeout=8)
-        r.raise_for_status()
-        usd_kzt = float(r.json()["kzt"])
+def _fx_jsdelivr(http, base: str, timeout: float) -> float:
+    r = timed_get(http, "fx", "jsdelivr",
+                  f"{JSDELIVR_URL}/gh/fawazahmed0/currency-api@1/latest/currencies/{base.lower()}/kzt.json",
+                  timeout=timeout)
+    r.raise_for_status()
+    return float(r.json()["kzt"])
 
-        r2 = requests.get("https://cdn.jsdelivr.net/gh/fawazahmed0/currency-api@1/latest/currencies/eur/kzt.json", timeout=8)
-        r2.raise_for_status()
-        eur_kzt = float(r2.json()["kzt"])
-        return usd_kzt, eur_kzt, True
-    except Exception as e:
-        log.warning("[FX] jsDelivr currency-api failed: %s", e)
 
-    # --- Last resort: exchangerate.host (works in many envs) ---
-    try:
-        r = requests.get("https://api.exchangerate.host/latest", params={"base": "USD", "symbols": "KZT"}, timeout=8)
-        r.raise_for_status()
-        usd_kzt = float(r.json().get("rates", {}).get("KZT"))
+def _fx_exchangerate_host(http, base: str, timeout: float) -> float:
+    r = timed_get(http, "fx", "exchangerate.host", f"{EXCHANGERATE_HOST_URL}/latest",
+                  params={"base": base, "symbols": "KZT"}, timeout=timeout)
+    r.raise_for_status()
+    rate = float(r.json().get("rates", {}).get("KZT") or 0)
+    if not rate:
+        raise ValueError("Missing rates in exchangerate.host response")
+    return rate
 
-        r2 = requests.get("https://api.exchangerate.host/latest", params={"base": "EUR", "symbols": "KZT"}, timeout=8)
-        r2.raise_for_status()
-        eur_kzt = float(r2.json().get("rates", {}).get("KZT"))
 
-        if usd_kzt and eur_kzt:
-            return usd_kzt, eur_kzt, True
-        raise ValueError("Missing rates in exchangerate.host response")
+# Primary: open.er-api.com (KZT supported)
+# Fallback: jsdelivr currency-api (daily JSON on GitHub)
+# Last resort: exchangerate.host (some networks return partial JSON)
+FX_PROVIDERS = [
+    ("erapi", _fx_erapi),
+    ("jsdelivr", _fx_jsdelivr),
+    ("exchangerate.host", _fx_exchangerate_host),
+]
+
+# one task per provider, which waits on its USD and EUR requests; the requests run on
+# their own pool so a provider task can never wait on work queued behind other provider tasks
+_fx_pool = ThreadPoolExecutor(max_workers=len(FX_PROVIDERS), thread_name_prefix="fx")
+_fx_requests = ThreadPoolExecutor(max_workers=2 * len(FX_PROVIDERS), thread_name_prefix="fx-req")
+
+
+def _fx_pair(http, name: str, fetch, timeout: float) -> Tuple[float, float]:
+    """USD->KZT and EUR->KZT from one provider, both requests in parallel."""
+    deadline = time.monotonic() + 2 * timeout
+    usd = _fx_requests.submit(fetch, http, "USD", timeout)
+    eur = _fx_requests.submit(fetch, http, "EUR", timeout)
+    try:
+        pair = usd.result(timeout=max(0.0, deadline - time.monotonic())), \
+            eur.result(timeout=max(0.0, deadline - time.monotonic()))
     except Exception as e:
-        log.warning("[FX] exchangerate.host failed: %s", e)
+        c_fetch.labels("fx", name, "error").inc()
+        log.warning("[FX] %s failed: %s", name, e)
+        raise
+    c_fetch.labels("fx", name, "ok").inc()
+    return pair
+
+
+def fetch_fx_rates(session=None, timeout: float = HTTP_TIMEOUT, hedge: float = FX_HEDGE_SECONDS):
+    """
+    Returns (usd_kzt, eur_kzt, ok, provider).
+    The primary provider gets `hedge` seconds head start; after that (or as
+    soon as it fails) the fallbacks are raced against it and the first valid
+    answer wins. Losers finish in the background and are ignored.
+    """
+    http = session or requests
+    deadline = time.monotonic() + 2 * timeout
+    (primary, fetch), fallbacks = FX_PROVIDERS[0], FX_PROVIDERS[1:]
+    running = {_fx_pool.submit(_fx_pair, http, primary, fetch, timeout): primary}
+    hedged = False
+    while running:
+        budget = hedge if not hedged else deadline - time.monotonic()
+        done, _ = wait(running, timeout=max(0.0, budget), return_when=FIRST_COMPLETED)
+        for fut in done:
+            name = running.pop(fut)
+            if fut.exception() is None:
+                usd_kzt, eur_kzt = fut.result()
+                c_fx_selected.labels(name).inc()
+                return usd_kzt, eur_kzt, True, name
+        if not hedged and (not done or not running):
+            hedged = True
+            for name, fetch in fallbacks:
+                running[_fx_pool.submit(_fx_pair, http, name, fetch, timeout)] = name
+        elif not done:
+            log.warning("[FX] no provider answered within %.1fs", 2 * timeout)
+            break
 
     # if all fail
-    return 0.0, 0.0, False
+    return 0.0, 0.0, False, None
+
 
+# repo -> (etag, (stars, forks, open_issues)) of the last 200 response
+_gh_etags = {}
 
 
-def fetch_github(repo: str) -> Tuple[int, int, int, bool]:
+def fetch_github(repo: str, session=None, timeout: float = HTTP_TIMEOUT) -> Tuple[int, int, int, bool]:
     """
     Returns (stars, forks, open_issues, ok) for a repo like 'owner/name'.
+    Sends If-None-Match with the last ETag: an unchanged repo answers 304
+    with no body, which does not count against the rate limit.
     """
+    http = session or requests
     try:
-        url = f"https://api.github.com/repos/{repo}"
-        r = requests.get(
+        url = f"{GITHUB_API_URL}/repos/{repo}"
+        headers = {"User-Agent": "custom-exporter"}
+        etag, cached = _gh_etags.get(repo, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        r = timed_get(
+            http, "github", "/repos/{repo}",
             url,
-            headers={"User-Agent": "custom-exporter"},
-            timeout=HTTP_TIMEOUT,
+            headers=headers,
+            timeout=timeout,
         )
+        if r.status_code == 304 and cached:
+            c_fetch.labels("github", "github", "not_modified").inc()
+            return (*cached, True)
         # GitHub may rate-limit with 403; still parse message
         r.raise_for_status()
         j = r.json()
         stars = int(j.get("stargazers_count", 0))
         forks = int(j.get("forks_count", 0))
         open_issues = int(j.get("open_issues_count", 0))
+        if r.headers.get("ETag"):
+            _gh_etags[repo] = (r.headers["ETag"], (stars, forks, open_issues))
+        c_fetch.labels("github", "github", "ok").inc()
         return stars, forks, open_issues, True
     except Exception as e:
+        c_fetch.labels("github", "github", "error").inc()
         log.warning("[GITHUB] fetch failed for %s: %s", repo, e)
         return 0, 0, 0, False
 
 
+# ----------------
+# Source updaters
+# ----------------
+def update_weather(session, timeout):
+    temp_c, wind_ms, wind_deg, ok_w = fetch_weather(CITY_LAT, CITY_LON, session, timeout)
+    g_temp_c.set(temp_c)
+    g_windspeed_ms.set(wind_ms)
+    g_winddir_deg.set(wind_deg)
+    g_openmeteo_up.set(1 if ok_w else 0)
+    log.info("[WEATHER] ok=%s temp=%.1fC wind=%.1fm/s dir=%.0f", ok_w, temp_c, wind_ms, wind_deg)
+    return ok_w
+
+
+def update_fx(session, timeout):
+    usd_kzt, eur_kzt, ok_fx, provider = fetch_fx_rates(session, timeout)
+    g_fx_up.set(1 if ok_fx else 0)
+    if ok_fx:
+        fx_last.put((usd_kzt, eur_kzt))
+    elif fx_last.get():
+        usd_kzt, eur_kzt = fx_last.get()     # keep serving the last good rates
+    else:
+        log.info("[FX] ok=False, no rates yet")
+        return False
+    g_fx_usd_kzt.set(usd_kzt)
+    g_fx_eur_kzt.set(eur_kzt)
+    log.info("[FX] ok=%s via=%s usd_kzt=%.3f eur_kzt=%.3f age=%.0fs",
+             ok_fx, provider or "cache", usd_kzt, eur_kzt, fx_last.age())
+    return ok_fx
+
+
+def update_github(session, timeout):
+    stars, forks, issues, ok_gh = fetch_github(GITHUB_REPO, session, timeout)
+    g_gh_up.set(1 if ok_gh else 0)
+    if ok_gh:
+        gh_last.put((stars, forks, issues))
+    elif gh_last.get():
+        stars, forks, issues = gh_last.get()
+    else:
+        log.info("[GITHUB] ok=False, no stats yet")
+        return False
+    g_gh_stars.set(stars)
+    g_gh_forks.set(forks)
+    g_gh_open_issues.set(issues)
+    log.info("[GITHUB] ok=%s stars=%d forks=%d issues=%d age=%.0fs", ok_gh, stars, forks, issues, gh_last.age())
+    return ok_gh
+
+
+@dataclass
+class Source:
+    name: str
+    update: Callable[[requests.Session, float], bool]
+    interval: float
+    timeout: float
+
+
+SOURCES = [
+    Source("weather", update_weather, WEATHER_SECONDS, WEATHER_TIMEOUT),
+    Source("fx", update_fx, FX_SECONDS, FX_TIMEOUT),
+    Source("github", update_github, GITHUB_SECONDS, GITHUB_TIMEOUT),
+]
+
+
+def run_source(src: Source, stop: threading.Event) -> None:
+    """Poll one source on its own schedule until `stop` is set."""
+    session = make_session()
+    try:
+        while not stop.is_set():
+            t0 = time.monotonic()
+            try:
+                if src.update(session, src.timeout):
+                    g_last_success.labels(src.name).set_to_current_time()
+            except Exception as e:  # never let one source kill its thread
+                log.warning("[%s] update crashed: %s", src.name.upper(), e)
+            elapsed = time.monotonic() - t0
+            s_cycle.labels(src.name).observe(elapsed)
+            stop.wait(max(0.0, src.interval - elapsed))
+    finally:
+        session.close()
+
+
+def start_sources(sources, stop: threading.Event) -> list:
+    threads = [threading.Thread(target=run_source, args=(src, stop), name=f"src-{src.name}", daemon=True)
+               for src in sources]
+    for t in threads:
+        t.start()
+    return threads
+
+
+# -------------
+# HTTP server
+# -------------
+class ExporterHandler(BaseHTTPRequestHandler):
+    """/metrics (Prometheus text format) and /debug (recent fetch timings as JSON)."""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/metrics"):
+            self._send(200, CONTENT_TYPE_LATEST, generate_latest(REGISTRY))
+        elif path == "/debug":
+            recent = list(RECENT)
+            body = {
+                "recent": recent,
+                "slowest": sorted(recent, key=lambda r: -r["ms"])[:10],
+                "fx_age_s": round(fx_last.age(), 1),
+                "github_age_s": round(gh_last.age(), 1),
+                "github_etag": {repo: etag for repo, (etag, _) in _gh_etags.items()},
+            }
+            self._send(200, "application/json", json.dumps(body, indent=2).encode())
+        else:
+            self._send(404, "text/plain", b"not found\n")
+
+    def _send(self, code: int, ctype: str, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):  # scrapes every few seconds would flood the log
+        pass
+
+
+def start_server(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("", port), ExporterHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+    return server
+
+
 # -------------
 # Main loop
 # -------------
 def main() -> None:
     log.info(
-        "Starting custom exporter on port %d, loop=%ds, city=(%s,%s), repo=%s",
-        PORT, LOOP_SECONDS, CITY_LAT, CITY_LON, GITHUB_REPO,
+        "Starting custom exporter on port %d, intervals(w=%ss fx=%ss gh=%ss), city=(%s,%s), repo=%s",
+        PORT, WEATHER_SECONDS, FX_SECONDS, GITHUB_SECONDS, CITY_LAT, CITY_LON, GITHUB_REPO,
     )
-    start_http_server(PORT)
-
-    while True:
-        # WEATHER
-        temp_c, wind_ms, wind_deg, ok_w = fetch_weather(CITY_LAT, CITY_LON)
-        g_temp_c.set(temp_c)
-        g_windspeed_ms.set(wind_ms)
-        g_winddir_deg.set(wind_deg)
-        g_openmeteo_up.set(1 if ok_w else 0)
-
-        # FX
-        usd_kzt, eur_kzt, ok_fx = fetch_fx_rates()
-        g_fx_usd_kzt.set(usd_kzt)
-        g_fx_eur_kzt.set(eur_kzt)
-        g_fx_up.set(1 if ok_fx else 0)
-
-        # GITHUB
-        stars, forks, issues, ok_gh = fetch_github(GITHUB_REPO)
-        g_gh_stars.set(stars)
-        g_gh_forks.set(forks)
-        g_gh_open_issues.set(issues)
-        g_gh_up.set(1 if ok_gh else 0)
-
-        log.info(
-            "OK(w=%s fx=%s gh=%s)  temp=%.1fC wind=%.1fm/s usd_kzt=%.3f eur_kzt=%.3f stars=%d forks=%d issues=%d",
-            ok_w, ok_fx, ok_gh, temp_c, wind_ms, usd_kzt, eur_kzt, stars, forks, issues
-        )
-
-        time.sleep(LOOP_SECONDS)
+    csgo = collector_from_env()
+    if csgo:
+        REGISTRY.register(csgo)
+        csgo.start()
+    server = start_server(PORT)
+
+    stop = threading.Event()
+    threads = start_sources(SOURCES, stop)
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(1)
+    finally:
+        stop.set()
+        server.shutdown()
 
 
 if __name__ == "__main__":
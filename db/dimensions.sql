@@ -0,0 +1,75 @@
+-- Integer dimensions for teams, players and maps. Ids are assigned once (by the ETL,
+-- db/transform.sql, or the live generator) and never renumbered; '' is a name like
+-- any other, NULL has no id. The fact tables carry the ids next to the names.
+CREATE TABLE IF NOT EXISTS dim_team (
+    team_id    INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name       TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS dim_player (
+    player_id  INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name       TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS dim_map (
+    map_id     SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name       TEXT NOT NULL UNIQUE
+);
+
+ALTER TABLE matches          ADD COLUMN IF NOT EXISTS team_1_id   INT,
+                             ADD COLUMN IF NOT EXISTS team_2_id   INT;
+ALTER TABLE results          ADD COLUMN IF NOT EXISTS map_id      SMALLINT;
+ALTER TABLE players_raw      ADD COLUMN IF NOT EXISTS player_id   INT,
+                             ADD COLUMN IF NOT EXISTS team_id     INT;
+ALTER TABLE team_map_results ADD COLUMN IF NOT EXISTS team_id     INT,
+                             ADD COLUMN IF NOT EXISTS opponent_id INT,
+                             ADD COLUMN IF NOT EXISTS map_id      SMALLINT;
+
+-- Backfill: intern every name (in name order, so a fresh database gets the same ids),
+-- then fill the ids still missing. Safe to re-run (NOT EXISTS keeps the identity
+-- sequences from being spent on names that are already there).
+INSERT INTO dim_team(name)
+SELECT name FROM (
+    SELECT team_1 AS name FROM matches
+    UNION
+    SELECT team_2 FROM matches
+    UNION
+    SELECT team FROM players_raw
+) t
+WHERE name IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_team d WHERE d.name = t.name)
+ORDER BY name
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_player(name)
+SELECT DISTINCT p.player_name FROM players_raw p
+WHERE p.player_name IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_player d WHERE d.name = p.player_name)
+ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_map(name)
+SELECT DISTINCT r.map FROM results r
+WHERE r.map IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_map d WHERE d.name = r.map)
+ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+UPDATE matches m SET team_1_id = t.team_id FROM dim_team t WHERE t.name = m.team_1 AND m.team_1_id IS NULL;
+UPDATE matches m SET team_2_id = t.team_id FROM dim_team t WHERE t.name = m.team_2 AND m.team_2_id IS NULL;
+UPDATE results r SET map_id = d.map_id FROM dim_map d WHERE d.name = r.map AND r.map_id IS NULL;
+UPDATE players_raw p SET player_id = d.player_id FROM dim_player d WHERE d.name = p.player_name AND p.player_id IS NULL;
+UPDATE players_raw p SET team_id = t.team_id FROM dim_team t WHERE t.name = p.team AND p.team_id IS NULL;
+UPDATE team_map_results x SET team_id = t.team_id FROM dim_team t WHERE t.name = x.team AND x.team_id IS NULL;
+UPDATE team_map_results x SET opponent_id = t.team_id FROM dim_team t WHERE t.name = x.opponent AND x.opponent_id IS NULL;
+UPDATE team_map_results x SET map_id = d.map_id FROM dim_map d WHERE d.name = x.map AND x.map_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS matches_team_1_id_idx              ON matches (team_1_id);
+CREATE INDEX IF NOT EXISTS matches_team_2_id_idx              ON matches (team_2_id);
+CREATE INDEX IF NOT EXISTS players_raw_player_latest_idx      ON players_raw (player_id, match_date DESC NULLS LAST, match_id DESC);
+CREATE INDEX IF NOT EXISTS team_map_results_event_team_id_idx ON team_map_results (event_id, team_id);
+CREATE INDEX IF NOT EXISTS team_map_results_date_team_id_idx  ON team_map_results (match_date, team_id);
+
+ANALYZE dim_team;
+ANALYZE dim_player;
+ANALYZE dim_map;
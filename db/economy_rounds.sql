@@ -0,0 +1,69 @@
+-- Round-level economy: one row per (match, map, round), unpivoted from the wide
+-- economy columns ("N_winner", "N_t1", "N_t2", N = 1..30). Rounds that were not
+-- played (no winner and no equipment values) are left out. Like team_map_results
+-- it has no primary key: every economy row is kept, as the wide-table queries
+-- counted them.
+CREATE TABLE IF NOT EXISTS economy_rounds (
+    match_id      INT       NOT NULL,
+    event_id      INT       NOT NULL,
+    map           TEXT      NOT NULL,
+    round         SMALLINT  NOT NULL,   -- 1..30; 1 and 16 are the pistol rounds
+    team_1        TEXT,                 -- the economy row's own teams: its side order
+    team_2        TEXT,                 -- need not match the matches row
+    winner        SMALLINT,             -- 1 = team_1, 2 = team_2 above
+    t1_equipment  INT,                  -- equipment value of team_1 / team_2
+    t2_equipment  INT
+);
+
+-- tables created before the team columns existed
+ALTER TABLE economy_rounds ADD COLUMN IF NOT EXISTS team_1 TEXT,
+                           ADD COLUMN IF NOT EXISTS team_2 TEXT;
+UPDATE economy_rounds r SET team_1 = e.team_1, team_2 = e.team_2
+FROM economy e
+WHERE e.match_id = r.match_id AND e._map = r.map
+  AND r.team_1 IS NULL AND r.team_2 IS NULL;
+
+CREATE INDEX IF NOT EXISTS economy_rounds_event_round_idx ON economy_rounds (event_id, round);
+CREATE INDEX IF NOT EXISTS economy_rounds_match_idx       ON economy_rounds (match_id);
+
+-- Backfill from the wide table (etl_loader.py does the same from economy_stage)
+INSERT INTO economy_rounds(match_id, event_id, map, round, team_1, team_2, winner, t1_equipment, t2_equipment)
+SELECT e.match_id, e.event_id, e._map, r.round, e.team_1, e.team_2, r.winner::numeric::smallint,
+       r.t1::numeric::int, r.t2::numeric::int
+FROM economy e
+CROSS JOIN LATERAL (VALUES ( 1, e."1_winner", e."1_t1", e."1_t2"),
+                           ( 2, e."2_winner", e."2_t1", e."2_t2"),
+                           ( 3, e."3_winner", e."3_t1", e."3_t2"),
+                           ( 4, e."4_winner", e."4_t1", e."4_t2"),
+                           ( 5, e."5_winner", e."5_t1", e."5_t2"),
+                           ( 6, e."6_winner", e."6_t1", e."6_t2"),
+                           ( 7, e."7_winner", e."7_t1", e."7_t2"),
+                           ( 8, e."8_winner", e."8_t1", e."8_t2"),
+                           ( 9, e."9_winner", e."9_t1", e."9_t2"),
+                           (10, e."10_winner", e."10_t1", e."10_t2"),
+                           (11, e."11_winner", e."11_t1", e."11_t2"),
+                           (12, e."12_winner", e."12_t1", e."12_t2"),
+                           (13, e."13_winner", e."13_t1", e."13_t2"),
+                           (14, e."14_winner", e."14_t1", e."14_t2"),
+                           (15, e."15_winner", e."15_t1", e."15_t2"),
+                           (16, e."16_winner", e."16_t1", e."16_t2"),
+                           (17, e."17_winner", e."17_t1", e."17_t2"),
+                           (18, e."18_winner", e."18_t1", e."18_t2"),
+                           (19, e."19_winner", e."19_t1", e."19_t2"),
+                           (20, e."20_winner", e."20_t1", e."20_t2"),
+                           (21, e."21_winner", e."21_t1", e."21_t2"),
+                           (22, e."22_winner", e."22_t1", e."22_t2"),
+                           (23, e."23_winner", e."23_t1", e."23_t2"),
+                           (24, e."24_winner", e."24_t1", e."24_t2"),
+                           (25, e."25_winner", e."25_t1", e."25_t2"),
+                           (26, e."26_winner", e."26_t1", e."26_t2"),
+                           (27, e."27_winner", e."27_t1", e."27_t2"),
+                           (28, e."28_winner", e."28_t1", e."28_t2"),
+                           (29, e."29_winner", e."29_t1", e."29_t2"),
+                           (30, e."30_winner", e."30_t1", e."30_t2")) AS r(round, winner, t1, t2)
+WHERE e._map IS NOT NULL
+  AND (r.winner IS NOT NULL OR r.t1 IS NOT NULL OR r.t2 IS NOT NULL)
+  AND NOT EXISTS (SELECT 1 FROM economy_rounds x WHERE x.match_id = e.match_id)
+ORDER BY e.match_id, e._map, r.round;
+
+ANALYZE economy_rounds;
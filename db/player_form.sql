@@ -0,0 +1,45 @@
+-- Rolling player form maintained by python/player_form.py.
+
+-- dated checkpoints: the form of a player after their last map of `valid_from`,
+-- valid until their next checkpoint (valid_to NULL = current)
+CREATE TABLE IF NOT EXISTS player_form (
+    player_name     TEXT NOT NULL,
+    valid_from      DATE NOT NULL,
+    valid_to        DATE,
+    team            TEXT,
+    maps            INT  NOT NULL,
+    ewma_rating     DOUBLE PRECISION,
+    ewma_adr        DOUBLE PRECISION,
+    ewma_kast       DOUBLE PRECISION,
+    ewma_kd         DOUBLE PRECISION,
+    last_n_rating   DOUBLE PRECISION,
+    last_n_adr      DOUBLE PRECISION,
+    last_n_kast     DOUBLE PRECISION,
+    last_n_kd       DOUBLE PRECISION,
+    last_match_id   INT,
+    PRIMARY KEY (player_name, valid_from)
+);
+
+CREATE INDEX IF NOT EXISTS player_form_valid_from_idx ON player_form (valid_from);
+CREATE INDEX IF NOT EXISTS player_form_current_idx    ON player_form (ewma_rating DESC) WHERE valid_to IS NULL;
+
+-- running state per player: EWMA values and the last-N ring buffer
+CREATE TABLE IF NOT EXISTS player_form_players (
+    player_name     TEXT PRIMARY KEY,
+    team            TEXT,
+    maps            INT      NOT NULL,
+    last_match_id   INT,
+    last_date       DATE,
+    seen            INT[]    NOT NULL,   -- non-NULL values seen per stat
+    ewma            FLOAT8[] NOT NULL,
+    ring_pos        INT      NOT NULL,   -- maps written to the ring
+    ring            REAL[]   NOT NULL    -- window x stats, row-major
+);
+
+CREATE TABLE IF NOT EXISTS player_form_state (
+    id          SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    watermark   INT              NOT NULL,   -- highest players_raw.match_id folded in
+    halflife    DOUBLE PRECISION NOT NULL,
+    window_n    INT              NOT NULL,
+    updated_at  TIMESTAMPTZ      NOT NULL DEFAULT now()
+);
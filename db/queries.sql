@@ -17,15 +17,11 @@ LIMIT 1;
 -- 02. Which team won the most pistol rounds in a tournament (example event_id = 2208)?
 SELECT event_id, winner_team, COUNT(*) AS pistol_rounds_won
 FROM (
-    SELECT event_id, match_id,
-           CASE WHEN "1_winner" = 1 THEN team_1
-                WHEN "1_winner" = 2 THEN team_2 END AS winner_team
-    FROM economy
-    UNION ALL
-    SELECT event_id, match_id,
-           CASE WHEN "16_winner" = 1 THEN team_1
-                WHEN "16_winner" = 2 THEN team_2 END
-    FROM economy
+    SELECT r.event_id,
+           CASE WHEN r.winner = 1 THEN r.team_1
+                WHEN r.winner = 2 THEN r.team_2 END AS winner_team
+    FROM economy_rounds r
+    WHERE r.round IN (1, 16)
 ) t
 WHERE winner_team IS NOT NULL
 GROUP BY event_id, winner_team
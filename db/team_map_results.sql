@@ -0,0 +1,32 @@
+-- Long-format fact table: one row per team per map (the unpivot of results JOIN matches
+-- that the report queries used to rebuild with UNION ALL on every call).
+CREATE TABLE IF NOT EXISTS team_map_results (
+    match_id      INT       NOT NULL,
+    event_id      INT       NOT NULL,
+    match_date    DATE,
+    map           TEXT,
+    side          SMALLINT  NOT NULL,   -- 1 = team_1, 2 = team_2 in matches
+    team          TEXT,
+    opponent      TEXT,
+    rounds_won    SMALLINT,
+    rounds_lost   SMALLINT,
+    is_win        BOOLEAN,              -- map won   (results.map_winner)
+    is_match_win  BOOLEAN               -- match won (results.match_winner)
+);
+
+CREATE INDEX IF NOT EXISTS team_map_results_event_team_idx ON team_map_results (event_id, team);
+CREATE INDEX IF NOT EXISTS team_map_results_date_idx       ON team_map_results (match_date);
+CREATE INDEX IF NOT EXISTS team_map_results_match_idx      ON team_map_results (match_id);
+
+-- Backfill (same statement as in transform.sql; only matches not unpivoted yet)
+INSERT INTO team_map_results(match_id, event_id, match_date, map, side, team, opponent,
+                             rounds_won, rounds_lost, is_win, is_match_win)
+SELECT r.match_id, r.event_id, m.match_date::date, r.map, s.side, s.team, s.opponent,
+       s.rw, s.rl, r.map_winner = s.side, r.match_winner = s.side
+FROM results r
+JOIN matches m ON m.match_id = r.match_id
+CROSS JOIN LATERAL (VALUES (1, m.team_1, m.team_2, r.result_1, r.result_2),
+                           (2, m.team_2, m.team_1, r.result_2, r.result_1)) AS s(side, team, opponent, rw, rl)
+WHERE NOT EXISTS (SELECT 1 FROM team_map_results t WHERE t.match_id = r.match_id);
+
+ANALYZE team_map_results;
@@ -0,0 +1,38 @@
+-- Elo team ratings maintained by python/team_ratings.py (one Elo game per map).
+
+-- current rating per team
+CREATE TABLE IF NOT EXISTS team_ratings (
+    team             TEXT PRIMARY KEY,
+    rating           DOUBLE PRECISION NOT NULL,
+    maps_played      INT  NOT NULL,
+    map_wins         INT  NOT NULL,
+    last_match_id    INT,
+    last_match_date  DATE
+);
+
+-- rating of both sides before / after every rated map, in replay order (seq)
+CREATE TABLE IF NOT EXISTS team_rating_history (
+    seq            BIGINT   NOT NULL,
+    match_id       INT      NOT NULL,
+    event_id       INT      NOT NULL,
+    match_date     DATE,
+    map            TEXT,
+    team           TEXT     NOT NULL,
+    opponent       TEXT     NOT NULL,
+    is_win         BOOLEAN  NOT NULL,
+    rating_before  DOUBLE PRECISION NOT NULL,
+    rating_after   DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS team_rating_history_match_idx     ON team_rating_history (match_id);
+CREATE INDEX IF NOT EXISTS team_rating_history_team_date_idx ON team_rating_history (team, match_date);
+
+-- one row: how far the replay got and with which constants
+CREATE TABLE IF NOT EXISTS team_rating_state (
+    id          SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    watermark   INT              NOT NULL,   -- highest results.match_id replayed
+    seq         BIGINT           NOT NULL,   -- maps replayed
+    k           DOUBLE PRECISION NOT NULL,
+    base        DOUBLE PRECISION NOT NULL,
+    updated_at  TIMESTAMPTZ      NOT NULL DEFAULT now()
+);
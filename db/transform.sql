@@ -5,21 +5,52 @@ SELECT DISTINCT event_id
 FROM results_stage
 ON CONFLICT (event_id) DO NOTHING;
 
+-- Dimensions (db/dimensions.sql): new names get their ids before the facts reference them
+INSERT INTO dim_team(name)
+SELECT name FROM (
+    SELECT team_1 AS name FROM economy_stage
+    UNION
+    SELECT team_2 FROM economy_stage
+    UNION
+    SELECT team FROM players_stage
+) t
+WHERE name IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_team d WHERE d.name = t.name)
+ORDER BY name
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_player(name)
+SELECT DISTINCT s.player_name FROM players_stage s
+WHERE s.player_name IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_player d WHERE d.name = s.player_name)
+ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO dim_map(name)
+SELECT DISTINCT s.map FROM results_stage s
+WHERE s.map IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM dim_map d WHERE d.name = s.map)
+ORDER BY 1
+ON CONFLICT (name) DO NOTHING;
+
 -- Matches
-INSERT INTO matches(match_id, event_id, match_date, team_1, team_2, best_of)
-SELECT DISTINCT match_id, event_id, date, team_1, team_2,
-       NULLIF(best_of,'o')::int
-FROM economy_stage
+INSERT INTO matches(match_id, event_id, match_date, team_1, team_2, best_of, team_1_id, team_2_id)
+SELECT DISTINCT s.match_id, s.event_id, s.date, s.team_1, s.team_2,
+       NULLIF(s.best_of,'o')::int, t1.team_id, t2.team_id
+FROM economy_stage s
+LEFT JOIN dim_team t1 ON t1.name = s.team_1
+LEFT JOIN dim_team t2 ON t2.name = s.team_2
 ON CONFLICT (match_id) DO NOTHING;
 
 -- Results
 INSERT INTO results(match_id, event_id, map, result_1, result_2, map_winner, match_winner,
                     starting_ct, ct_1, t_1, ct_2, t_2,
-                    rank_1, rank_2, map_wins_1, map_wins_2)
-SELECT match_id, event_id, map, result_1, result_2, map_winner, match_winner,
-       starting_ct, ct_1, t_1, ct_2, t_2,
-       rank_1, rank_2, map_wins_1, map_wins_2
-FROM results_stage
+                    rank_1, rank_2, map_wins_1, map_wins_2, map_id)
+SELECT s.match_id, s.event_id, s.map, s.result_1, s.result_2, s.map_winner, s.match_winner,
+       s.starting_ct, s.ct_1, s.t_1, s.ct_2, s.t_2,
+       s.rank_1, s.rank_2, s.map_wins_1, s.map_wins_2, d.map_id
+FROM results_stage s
+LEFT JOIN dim_map d ON d.name = s.map
 ON CONFLICT DO NOTHING;
 
 -- Picks
@@ -36,8 +67,62 @@ ON CONFLICT (match_id) DO NOTHING;
 
 -- Players
 INSERT INTO players_raw(match_id, event_id, match_date, player_name, team, opponent, country,
-                        kills, deaths, adr, kast, kddiff, rating)
-SELECT match_id, event_id, date, player_name, team, opponent, country,
-       kills, deaths, adr, kast, kddiff, rating
-FROM players_stage
+                        kills, deaths, adr, kast, kddiff, rating, player_id, team_id)
+SELECT s.match_id, s.event_id, s.date, s.player_name, s.team, s.opponent, s.country,
+       s.kills, s.deaths, s.adr, s.kast, s.kddiff, s.rating, p.player_id, t.team_id
+FROM players_stage s
+LEFT JOIN dim_player p ON p.name = s.player_name
+LEFT JOIN dim_team t ON t.name = s.team
 ON CONFLICT DO NOTHING;
+
+-- Team/map long format (db/team_map_results.sql), only matches not unpivoted yet
+INSERT INTO team_map_results(match_id, event_id, match_date, map, side, team, opponent,
+                             rounds_won, rounds_lost, is_win, is_match_win, team_id, opponent_id, map_id)
+SELECT r.match_id, r.event_id, m.match_date::date, r.map, s.side, s.team, s.opponent,
+       s.rw, s.rl, r.map_winner = s.side, r.match_winner = s.side, s.team_id, s.opponent_id, r.map_id
+FROM results r
+JOIN matches m ON m.match_id = r.match_id
+CROSS JOIN LATERAL (VALUES (1, m.team_1, m.team_2, r.result_1, r.result_2, m.team_1_id, m.team_2_id),
+                           (2, m.team_2, m.team_1, r.result_2, r.result_1, m.team_2_id, m.team_1_id))
+                   AS s(side, team, opponent, rw, rl, team_id, opponent_id)
+WHERE NOT EXISTS (SELECT 1 FROM team_map_results t WHERE t.match_id = r.match_id);
+
+-- Economy rounds (db/economy_rounds.sql): the wide round columns unpivoted, only matches not unpivoted yet
+INSERT INTO economy_rounds(match_id, event_id, map, round, team_1, team_2, winner, t1_equipment, t2_equipment)
+SELECT e.match_id, e.event_id, e._map, r.round, e.team_1, e.team_2, r.winner::numeric::smallint,
+       r.t1::numeric::int, r.t2::numeric::int
+FROM economy_stage e
+CROSS JOIN LATERAL (VALUES ( 1, e."1_winner", e."1_t1", e."1_t2"),
+                           ( 2, e."2_winner", e."2_t1", e."2_t2"),
+                           ( 3, e."3_winner", e."3_t1", e."3_t2"),
+                           ( 4, e."4_winner", e."4_t1", e."4_t2"),
+                           ( 5, e."5_winner", e."5_t1", e."5_t2"),
+                           ( 6, e."6_winner", e."6_t1", e."6_t2"),
+                           ( 7, e."7_winner", e."7_t1", e."7_t2"),
+                           ( 8, e."8_winner", e."8_t1", e."8_t2"),
+                           ( 9, e."9_winner", e."9_t1", e."9_t2"),
+                           (10, e."10_winner", e."10_t1", e."10_t2"),
+                           (11, e."11_winner", e."11_t1", e."11_t2"),
+                           (12, e."12_winner", e."12_t1", e."12_t2"),
+                           (13, e."13_winner", e."13_t1", e."13_t2"),
+                           (14, e."14_winner", e."14_t1", e."14_t2"),
+                           (15, e."15_winner", e."15_t1", e."15_t2"),
+                           (16, e."16_winner", e."16_t1", e."16_t2"),
+                           (17, e."17_winner", e."17_t1", e."17_t2"),
+                           (18, e."18_winner", e."18_t1", e."18_t2"),
+                           (19, e."19_winner", e."19_t1", e."19_t2"),
+                           (20, e."20_winner", e."20_t1", e."20_t2"),
+                           (21, e."21_winner", e."21_t1", e."21_t2"),
+                           (22, e."22_winner", e."22_t1", e."22_t2"),
+                           (23, e."23_winner", e."23_t1", e."23_t2"),
+                           (24, e."24_winner", e."24_t1", e."24_t2"),
+                           (25, e."25_winner", e."25_t1", e."25_t2"),
+                           (26, e."26_winner", e."26_t1", e."26_t2"),
+                           (27, e."27_winner", e."27_t1", e."27_t2"),
+                           (28, e."28_winner", e."28_t1", e."28_t2"),
+                           (29, e."29_winner", e."29_t1", e."29_t2"),
+                           (30, e."30_winner", e."30_t1", e."30_t2")) AS r(round, winner, t1, t2)
+WHERE e._map IS NOT NULL
+  AND (r.winner IS NOT NULL OR r.t1 IS NOT NULL OR r.t2 IS NOT NULL)
+  AND NOT EXISTS (SELECT 1 FROM economy_rounds x WHERE x.match_id = e.match_id)
+ORDER BY e.match_id, e._map, r.round;
@@ -1,16 +1,129 @@
-import time
+import json
+import math
+import os
 import random
+import threading
+import time
+
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from prometheus_client import Counter, Histogram, start_http_server
 
-# ---- CONFIG ----
-DB_HOST = "localhost"
-DB_PORT = 5432
-DB_NAME = "csgo"                
-DB_USER = "postgres"               
-DB_PASS = "admin"               
-INTERVAL = 10                     
+# ---- CONFIG (env overrides) ----
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "5432"))
+DB_NAME = os.getenv("DB_NAME", "csgo")
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASS = os.getenv("DB_PASS", "admin")
+WORKERS = int(os.getenv("SIM_WORKERS", "4"))              # pooled connections / worker threads
+TARGET_OPS = float(os.getenv("SIM_TARGET_OPS", "50"))     # ops per second across workers (0 = max)
+DURATION = float(os.getenv("SIM_DURATION", "0"))          # seconds (0 = until Ctrl+C)
+MIX = os.getenv("SIM_MIX", "insert:40,update:30,delete:10,read:20")
+METRICS_PORT = int(os.getenv("SIM_METRICS_PORT", "8001"))
+REPORT_PATH = os.getenv("SIM_REPORT", "sim_latency.json")
+ID_REFRESH_SECONDS = 5
 # ----------------
 
+PLAYERS = ["s1mple", "ZywOo", "NiKo", "device", "m0NESY"]
+
+p_latency = Histogram("db_sim_op_seconds", "Simulator operation latency", ["op"],
+                      buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5))
+p_ops = Counter("db_sim_ops_total", "Simulator operations", ["op", "outcome"])
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        op, w = part.split(":")
+        mix[op.strip()] = float(w)
+    unknown = set(mix) - {"insert", "update", "delete", "read"}
+    if unknown: raise ValueError(f"unknown ops in SIM_MIX: {unknown}")
+    return mix
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram: values (microseconds) below 64us are exact,
+    above that every power of two is split into 32 linear buckets, so the
+    relative error stays under ~3% at every magnitude with constant memory.
+    """
+    SUB_BITS = 6
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max_us = 0
+        self.lock = threading.Lock()
+
+    def _index(self, us: int):
+        exp = max(0, us.bit_length() - self.SUB_BITS)
+        return exp, us >> exp
+
+    def _lower(self, exp: int, sub: int) -> int:
+        return sub << exp
+
+    def record(self, seconds: float):
+        us = max(0, int(seconds * 1_000_000))
+        key = self._index(us)
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.total += 1
+            self.max_us = max(self.max_us, us)
+
+    def percentile(self, p: float) -> float:
+        """Latency in ms at percentile p (0-100)."""
+        with self.lock:
+            if not self.total: return 0.0
+            rank = math.ceil(self.total * p / 100.0)
+            seen = 0
+            for key in sorted(self.counts):
+                seen += self.counts[key]
+                if seen >= rank: return self._lower(*key) / 1000.0
+        return self.max_us / 1000.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.total,
+            "p50_ms": self.percentile(50), "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99), "p999_ms": self.percentile(99.9),
+            "max_ms": self.max_us / 1000.0,
+            "buckets_us": {str(self._lower(*k)): c for k, c in sorted(self.counts.items())},
+        }
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.rate, self.lock, self.next_t = rate, threading.Lock(), time.monotonic()
+
+    def acquire(self):
+        if self.rate <= 0: return
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_t, now); self.next_t = start + 1.0 / self.rate
+        if start > now: time.sleep(start - now)
+
+
+class IdRange:
+    """Cached [min, max] of player_stats.id so random rows are picked with one index probe."""
+
+    def __init__(self):
+        self.lo, self.hi, self.checked = 0, 0, 0.0
+        self.lock = threading.Lock()
+
+    def refresh(self, cur):
+        cur.execute("SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM player_stats")
+        lo, hi = cur.fetchone()
+        with self.lock: self.lo, self.hi, self.checked = lo, hi, time.monotonic()
+
+    def saw_insert(self, new_id: int):
+        with self.lock: self.hi = max(self.hi, new_id)
+
+    def pick(self, cur):
+        if time.monotonic() - self.checked > ID_REFRESH_SECONDS: self.refresh(cur)
+        with self.lock: lo, hi = self.lo, self.hi
+        return random.randint(lo, hi) if hi else None
+
+
 def ensure_table(conn):
     with conn.cursor() as cur:
         cur.execute("""
@@ -24,52 +137,119 @@ def ensure_table(conn):
         """)
         conn.commit()
 
-def simulate_activity(conn):
-    with conn.cursor() as cur:
-        action = random.choice(["insert", "update", "delete"])
-        if action == "insert":
-            name = random.choice(["s1mple", "ZywOo", "NiKo", "device", "m0NESY"])
-            kills = random.randint(5, 30)
-            deaths = random.randint(0, 15)
-            score = kills * 10 - deaths * 5
-            cur.execute(
-                "INSERT INTO player_stats (player_name, kills, deaths, score) VALUES (%s, %s, %s, %s)",
-                (name, kills, deaths, score)
-            )
-            print(f"[+] Inserted {name} (kills={kills}, deaths={deaths})")
-
-        elif action == "update":
-            cur.execute("SELECT id FROM player_stats ORDER BY RANDOM() LIMIT 1;")
-            row = cur.fetchone()
-            if row:
-                cur.execute(
-                    "UPDATE player_stats SET kills = kills + %s WHERE id = %s;",
-                    (random.randint(1, 5), row[0])
-                )
-                print(f"[*] Updated row id={row[0]}")
-
-        elif action == "delete":
-            cur.execute("SELECT id FROM player_stats ORDER BY RANDOM() LIMIT 1;")
-            row = cur.fetchone()
-            if row:
-                cur.execute("DELETE FROM player_stats WHERE id = %s;", (row[0],))
-                print(f"[-] Deleted row id={row[0]}")
 
-        conn.commit()
+# first live row at or after a random id: a PK index probe instead of ORDER BY RANDOM()
+PICK = "(SELECT id FROM player_stats WHERE id >= %s ORDER BY id LIMIT 1)"
 
-def main():
-    while True:
+
+def do_op(cur, op: str, ids: IdRange):
+    if op == "insert":
+        name = random.choice(PLAYERS)
+        kills = random.randint(5, 30)
+        deaths = random.randint(0, 15)
+        score = kills * 10 - deaths * 5
+        cur.execute(
+            "INSERT INTO player_stats (player_name, kills, deaths, score) VALUES (%s, %s, %s, %s) RETURNING id",
+            (name, kills, deaths, score)
+        )
+        ids.saw_insert(cur.fetchone()[0])
+        return
+    rid = ids.pick(cur)
+    if rid is None: return
+    if op == "update":
+        cur.execute(f"UPDATE player_stats SET kills = kills + %s WHERE id = {PICK}", (random.randint(1, 5), rid))
+    elif op == "delete":
+        cur.execute(f"DELETE FROM player_stats WHERE id = {PICK}", (rid,))
+    elif op == "read":
+        cur.execute(f"SELECT * FROM player_stats WHERE id = {PICK}", (rid,))
+        cur.fetchall()
+
+
+def reconnect(pool, stop, max_delay=30.0):
+    """A pooled connection, retried with backoff while the database is down; None once stopped."""
+    delay = 0.5
+    while not stop.is_set():
         try:
-            with psycopg2.connect(
-                host=DB_HOST, port=DB_PORT,
-                dbname=DB_NAME, user=DB_USER, password=DB_PASS
-            ) as conn:
-                ensure_table(conn)
-                simulate_activity(conn)
+            return pool.getconn()
         except Exception as e:
-            print("Database error:", e)
-        time.sleep(INTERVAL)
+            p_ops.labels("connect", "error").inc()
+            print(f"Connect failed, retrying in {delay:.1f}s:", e)
+            stop.wait(delay); delay = min(delay * 2, max_delay)
+    return None
+
+
+def worker(pool, mix, limiter, ids, hists, stop):
+    ops, weights = list(mix), list(mix.values())
+    conn = reconnect(pool, stop)
+    try:
+        while conn is not None and not stop.is_set():
+            limiter.acquire()
+            op = random.choices(ops, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                with conn.cursor() as cur: do_op(cur, op, ids)
+                conn.commit()
+                outcome = "ok"
+            except Exception as e:
+                outcome = "error"
+                print(f"{'Database' if isinstance(e, psycopg2.Error) else 'Worker'} error ({op}):", e)
+                try:
+                    conn.rollback()
+                except Exception:
+                    # the connection itself is gone: drop it, a fresh one is taken below
+                    pool.putconn(conn, close=True); conn = None
+            dt = time.perf_counter() - t0
+            hists[op].record(dt)
+            p_latency.labels(op).observe(dt)
+            p_ops.labels(op, outcome).inc()
+            if conn is None: conn = reconnect(pool, stop)
+    finally:
+        if conn is not None: pool.putconn(conn)
+
+
+def write_report(hists, elapsed: float):
+    out = {"elapsed_s": round(elapsed, 3), "workers": WORKERS, "target_ops": TARGET_OPS,
+           "ops": {op: h.to_dict() for op, h in hists.items()}}
+    with open(REPORT_PATH, "w") as f: json.dump(out, f, indent=2)
+    total = sum(h.total for h in hists.values())
+    print(f"\n{total} ops in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.1f} ops/s) -> {REPORT_PATH}")
+    for op, h in hists.items():
+        d = h.to_dict()
+        print(f"  {op:<7} n={d['count']:<8} p50={d['p50_ms']:.2f}ms p99={d['p99_ms']:.2f}ms max={d['max_ms']:.2f}ms")
+
+
+def main():
+    mix = parse_mix(MIX)
+    pool = ThreadedConnectionPool(WORKERS, WORKERS, host=DB_HOST, port=DB_PORT,
+                                  dbname=DB_NAME, user=DB_USER, password=DB_PASS)
+    conn = pool.getconn()
+    try:
+        ensure_table(conn)
+        ids = IdRange()
+        with conn.cursor() as cur: ids.refresh(cur)
+        conn.commit()
+    finally:
+        if conn is not None: pool.putconn(conn)
+
+    start_http_server(METRICS_PORT)
+    hists = {op: LatencyHistogram() for op in mix}
+    limiter, stop = RateLimiter(TARGET_OPS), threading.Event()
+    threads = [threading.Thread(target=worker, args=(pool, mix, limiter, ids, hists, stop), daemon=True)
+               for _ in range(WORKERS)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    try:
+        while not stop.is_set():
+            time.sleep(0.5)
+            if DURATION and time.perf_counter() - t0 >= DURATION: stop.set()
+    except KeyboardInterrupt:
+        stop.set()
+    for t in threads: t.join()
+    write_report(hists, time.perf_counter() - t0)
+    pool.closeall()
+
 
 if __name__ == "__main__":
-    print("Starting CS:GO DB simulator...")
+    print(f"Starting CS:GO DB simulator: workers={WORKERS} target={TARGET_OPS or 'max'} ops/s mix={MIX} "
+          f"metrics=:{METRICS_PORT}")
     main()
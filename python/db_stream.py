@@ -0,0 +1,83 @@
+"""
+Chunked, memory-lean reads from Postgres.
+
+`iter_chunks` runs the query on a server-side (named) cursor via
+SQLAlchemy's stream_results and yields DataFrame chunks; `compact_dtypes`
+turns repeated text dimensions into categoricals and downcasts integers to
+the smallest fitting int dtype. Float and NUMERIC measures stay float64:
+they get summed across chunks, and float32 partials drift from what SQL
+would return. `reduce_chunks` folds per-chunk
+group-by partials so callers never hold the full raw frame.
+"""
+
+from decimal import Decimal
+
+import pandas as pd
+from pandas.api.types import (infer_dtype, is_integer_dtype, is_object_dtype,
+                              is_string_dtype)
+from sqlalchemy import text
+
+
+def compact_dtypes(df: pd.DataFrame, max_category_ratio=0.5) -> pd.DataFrame:
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if is_integer_dtype(s):
+            s = pd.to_numeric(s, downcast="integer")
+        elif is_object_dtype(s) and infer_dtype(s, skipna=True) == "decimal":
+            s = pd.to_numeric(s.map(lambda v: float(v) if isinstance(v, Decimal) else v)).astype("float64")
+        elif is_string_dtype(s) and infer_dtype(s, skipna=True) == "string":
+            if len(s) and s.nunique(dropna=True) <= max_category_ratio * len(s):
+                s = s.astype("category")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+class MemoryReport:
+    """Raw vs compact footprint of every chunk yielded for one query."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.rows = self.chunks = self.raw_bytes = self.compact_bytes = 0
+        self.peak_chunk_bytes = 0
+
+    def add(self, raw: pd.DataFrame, compact: pd.DataFrame):
+        self.rows += len(raw); self.chunks += 1
+        rb, cb = nbytes(raw), nbytes(compact)
+        self.raw_bytes += rb; self.compact_bytes += cb
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, cb)
+
+    def __str__(self):
+        mb = lambda b: b / 1_048_576
+        return (f"[mem] {self.label}: rows={self.rows} chunks={self.chunks} "
+                f"raw={mb(self.raw_bytes):.1f}MB compact={mb(self.compact_bytes):.1f}MB "
+                f"peak_chunk={mb(self.peak_chunk_bytes):.1f}MB")
+
+
+def iter_chunks(engine, sql: str, params=None, chunksize=50_000, compact=True, report=None):
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql(text(sql), conn, params=params or {}, chunksize=chunksize):
+            small = compact_dtypes(chunk) if compact else chunk
+            if report is not None: report.add(chunk, small)
+            yield small
+
+
+def reduce_chunks(chunks, by, how: dict) -> pd.DataFrame:
+    """
+    Group every chunk by `by` with `how` ({out_col: (src_col, "sum"|"count"|"size"|"max"|"min")})
+    and fold the partials into one running aggregate.
+    """
+    refold = {c: ("sum" if f in ("sum", "count", "size") else f) for c, (_, f) in how.items()}
+    running = None
+    for chunk in chunks:
+        g = chunk.groupby(by, observed=True, sort=False, dropna=False)
+        part = pd.DataFrame({c: (g.size() if f == "size" else g[src].agg(f)) for c, (src, f) in how.items()})
+        if running is None: running = part
+        else: running = pd.concat([running, part]).groupby(level=list(range(len(by))), sort=False, dropna=False).agg(refold)
+    if running is None: return pd.DataFrame(columns=list(by) + list(how))
+    return running.reset_index()
@@ -0,0 +1,236 @@
+"""
+Dimension lookups (event / team / player names) for report rendering.
+
+All dimensions are loaded with one query instead of one round trip per id;
+a player's team is the one of their latest map. Each dimension is an LRU
+bounded by `max_entries`; ids that fell out (or were never loaded) are
+fetched in bulk by `prefetch`, and ids that do not exist are remembered
+until the next reload. A daemon thread polls
+the modification counters of `events` and reloads when the table changes.
+
+`Interner` maps the integer ids of dim_team / dim_player / dim_map
+(db/dimensions.sql) to names and back, for queries that group by id.
+The report queries join those tables, so `ensure_dimensions` applies
+db/dimensions.sql at startup when they (or the id columns) are missing.
+
+Environment overrides (optional):
+  DIM_MAX_ENTRIES=50000
+  DIM_REFRESH_SECONDS=60     (0 disables background refresh)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import text
+
+DDL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "dimensions.sql")
+ID_COLUMNS = [("matches", "team_1_id"), ("matches", "team_2_id"), ("results", "map_id"),
+              ("players_raw", "player_id"), ("players_raw", "team_id"), ("team_map_results", "team_id"),
+              ("team_map_results", "opponent_id"), ("team_map_results", "map_id")]
+SQL_DIMS_READY = """
+SELECT to_regclass('dim_team') IS NOT NULL AND to_regclass('dim_player') IS NOT NULL
+       AND to_regclass('dim_map') IS NOT NULL
+       AND (SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name || '.' || column_name = ANY(:cols)) = :n
+"""
+SQL_ALL_DIMS = """
+SELECT 'event' AS kind, event_id::text AS key, event_name AS name FROM events
+UNION ALL
+SELECT 'team', name, name FROM dim_team
+WHERE name <> ''
+UNION ALL
+SELECT 'player', d.name, p.team
+FROM dim_player d
+LEFT JOIN LATERAL (SELECT team FROM players_raw r WHERE r.player_id = d.player_id
+                   ORDER BY r.match_date DESC NULLS LAST, r.match_id DESC LIMIT 1) p ON true
+"""
+SQL_EVENTS_BY_ID = "SELECT event_id, event_name FROM events WHERE event_id = ANY(:ids)"
+SQL_EVENTS_VERSION = """
+SELECT COALESCE((SELECT n_tup_ins + n_tup_upd + n_tup_del
+                 FROM pg_stat_user_tables WHERE relname = 'events'), 0),
+       (SELECT COUNT(*) FROM events)
+"""
+
+KINDS = ("event", "team", "player")
+
+
+def ensure_dimensions(engine) -> bool:
+    """Apply db/dimensions.sql if the dimension tables or id columns are missing; True if it ran."""
+    cols = [f"{t}.{c}" for t, c in ID_COLUMNS]
+    with engine.connect() as conn:
+        if conn.execute(text(SQL_DIMS_READY), {"cols": cols, "n": len(cols)}).scalar(): return False
+    try:
+        with open(DDL, encoding="utf-8") as f, engine.begin() as conn:
+            conn.exec_driver_sql(f.read())
+    except Exception as e:
+        raise RuntimeError(f"dimension tables are missing and {DDL} could not be applied ({e}); "
+                           f"run `psql -d csgo -f db/dimensions.sql` after db/team_map_results.sql") from e
+    print("[OK] dimension tables created (db/dimensions.sql)")
+    return True
+
+
+class DimensionLookup:
+    def __init__(self, engine, max_entries=50_000, refresh_seconds=60.0):
+        self.engine = engine
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self._dims = {k: OrderedDict() for k in KINDS}
+        self._lock = threading.RLock()
+        self._missing = set()     # event ids known not to exist
+        self._loaded = False
+        self._version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- loading ---
+    def _put(self, kind, key, name):
+        d = self._dims[kind]
+        d[key] = name; d.move_to_end(key)
+        while len(d) > self.max_entries: d.popitem(last=False)
+
+    def _events_version(self, conn):
+        return tuple(conn.execute(text(SQL_EVENTS_VERSION)).fetchone())
+
+    def load(self):
+        """(Re)load every dimension in a single round trip."""
+        with self.engine.begin() as conn:
+            version = self._events_version(conn)
+            rows = conn.execute(text(SQL_ALL_DIMS)).fetchall()
+        fresh = {k: OrderedDict() for k in KINDS}
+        with self._lock:
+            self._dims = fresh; self._missing = set()
+            for kind, key, name in rows:
+                if kind == "event": key = int(key)
+                self._put(kind, key, name.strip() if isinstance(name, str) else name)
+            self._version = version; self._loaded = True
+        return len(rows)
+
+    def _ensure_loaded(self):
+        if not self._loaded: self.load()
+
+    def prefetch(self, event_ids):
+        """Bulk-load the given event ids that are not cached (one query)."""
+        self._ensure_loaded()
+        with self._lock:
+            missing = sorted({int(e) for e in event_ids} - set(self._dims["event"]) - self._missing)
+        if not missing: return 0
+        with self.engine.begin() as conn:
+            rows = conn.execute(text(SQL_EVENTS_BY_ID), {"ids": missing}).fetchall()
+        with self._lock:
+            for eid, name in rows: self._put("event", int(eid), name.strip() if name else name)
+            self._missing |= set(missing) - {int(eid) for eid, _ in rows}
+        return len(rows)
+
+    # --- lookups ---
+    def get(self, kind: str, key, default=None):
+        self._ensure_loaded()
+        with self._lock:
+            d = self._dims[kind]
+            if key in d:
+                d.move_to_end(key)
+                return d[key]
+        return default
+
+    def event_name(self, event_id: int) -> str:
+        event_id = int(event_id)
+        name = self.get("event", event_id)
+        if name is None:
+            self.prefetch([event_id]); name = self.get("event", event_id)
+        return name or f"Event {event_id}"
+
+    def team_names(self) -> list:
+        self._ensure_loaded()
+        with self._lock: return sorted(self._dims["team"])
+
+    def player_team(self, player_name: str):
+        return self.get("player", player_name)
+
+    # --- background refresh ---
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                with self.engine.begin() as conn: version = self._events_version(conn)
+                if version != self._version: self.load()
+            except Exception as e:
+                print(f"[WARN] dimension refresh failed: {e}")
+
+    def start_refresh(self):
+        if self.refresh_seconds <= 0 or self._thread is not None: return
+        self._thread = threading.Thread(target=self._refresh_loop, name="dim-refresh", daemon=True)
+        self._thread.start()
+
+    def stop_refresh(self):
+        self._stop.set()
+
+
+def lookup_from_env(engine) -> DimensionLookup:
+    return DimensionLookup(
+        engine,
+        max_entries=int(os.getenv("DIM_MAX_ENTRIES", "50000")),
+        refresh_seconds=float(os.getenv("DIM_REFRESH_SECONDS", "60")),
+    )
+
+
+# -----------------
+# Integer ids (dim_team / dim_player / dim_map)
+# -----------------
+ID_TABLES = {"team": ("dim_team", "team_id"), "player": ("dim_player", "player_id"), "map": ("dim_map", "map_id")}
+
+
+class Interner:
+    """id <-> name for the dimension tables.
+
+    Ids are assigned once and never renumbered, so the cache only grows:
+    names are held in an array indexed by id, and an unknown id or name
+    costs one query for the rows above the highest cached id.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._names = {k: np.empty(0, dtype=object) for k in ID_TABLES}
+        self._ids = {k: {} for k in ID_TABLES}
+        self._lock = threading.Lock()
+
+    def sync(self, kind: str) -> int:
+        """Fetch the ids added since the last sync; returns how many."""
+        table, id_col = ID_TABLES[kind]
+        with self._lock:
+            top = len(self._names[kind]) - 1
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(f"SELECT {id_col}, name FROM {table} WHERE {id_col} > :top"),
+                                    {"top": top}).fetchall()
+            if not rows: return 0
+            names = np.empty(max(i for i, _ in rows) + 1, dtype=object)
+            names[:len(self._names[kind])] = self._names[kind]
+            for i, name in rows:
+                names[i] = name; self._ids[kind][name] = i
+            self._names[kind] = names
+        return len(rows)
+
+    def names(self, kind: str, ids) -> np.ndarray:
+        """Names of an id column (NULL / NaN / unknown ids -> None)."""
+        ids = np.asarray(ids, dtype=float)
+        ok = ~np.isnan(ids)
+        if ok.any() and ids[ok].max() >= len(self._names[kind]): self.sync(kind)
+        table = self._names[kind]
+        ix = np.where(ok, ids, -1).astype(np.int64)
+        ok &= (ix >= 0) & (ix < len(table))
+        out = np.full(len(ix), None, dtype=object)
+        out[ok] = table[ix[ok]]
+        return out
+
+    def name(self, kind: str, id_):
+        return self.names(kind, [np.nan if id_ is None else id_])[0]
+
+    def id(self, kind: str, name):
+        """Id of a name, None if it has none."""
+        if name not in self._ids[kind]: self.sync(kind)
+        return self._ids[kind].get(name)
+
+    def decode(self, df, columns: dict):
+        """Add name columns to a DataFrame: {id column: (kind, name column)}."""
+        for col, (kind, out) in columns.items(): df[out] = self.names(kind, df[col])
+        return df
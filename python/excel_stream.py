@@ -0,0 +1,76 @@
+"""
+Single-pass, streaming .xlsx writer (openpyxl write-only mode).
+
+Each sheet value may be a DataFrame, None, or any iterable of DataFrame
+chunks (e.g. pd.read_sql(..., chunksize=...)), so memory stays flat no
+matter how many rows are written. Numeric columns are decided from the
+DataFrame dtypes of the first chunk; freeze panes, auto-filter and the
+red-yellow-green ColorScaleRule are applied in the same pass.
+"""
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.rule import ColorScaleRule
+from openpyxl.utils import get_column_letter
+from pandas.api.types import infer_dtype, is_bool_dtype, is_numeric_dtype, is_object_dtype
+
+
+def color_scale_rule() -> ColorScaleRule:
+    return ColorScaleRule(
+        start_type="min", start_color="FFAA0000",
+        mid_type="percentile", mid_value=50, mid_color="FFFFFF00",
+        end_type="max", end_color="FF00AA00"
+    )
+
+
+def _chunks(data):
+    if data is None: return []
+    if isinstance(data, pd.DataFrame): return [data]
+    return data
+
+
+def _is_numeric(s: pd.Series) -> bool:
+    if is_bool_dtype(s): return False
+    if is_numeric_dtype(s): return True
+    # ROUND(...) in Postgres comes back as Decimal objects
+    return is_object_dtype(s) and infer_dtype(s, skipna=True) == "decimal"
+
+
+def _numeric_columns(df: pd.DataFrame) -> list:
+    return [i for i, c in enumerate(df.columns) if _is_numeric(df[c])]
+
+
+def _rows(df: pd.DataFrame):
+    # NaN / NaT / pd.NA -> empty cell, like DataFrame.to_excel
+    clean = df.astype(object).where(df.notna(), None)
+    return clean.itertuples(index=False, name=None)
+
+
+def write_sheet(wb: Workbook, name: str, data) -> int:
+    ws = wb.create_sheet(title=name[:31])
+    ws.freeze_panes = "B2"          # sheet views are written with the first row
+    header, numeric, n = None, [], 0
+    for chunk in _chunks(data):
+        if chunk is None: continue
+        if header is None:
+            header = [str(c) for c in chunk.columns]
+            numeric = _numeric_columns(chunk)
+            ws.append(header)
+        for row in _rows(chunk):
+            ws.append(row); n += 1
+    if header:
+        last = get_column_letter(len(header))
+        ws.auto_filter.ref = f"A1:{last}{n + 1}"
+        if n >= 3:
+            for i in numeric:
+                c = get_column_letter(i + 1)
+                ws.conditional_formatting.add(f"{c}2:{c}{n + 1}", color_scale_rule())
+    return n
+
+
+def write_workbook(path: str, sheets: dict) -> dict:
+    """Write all sheets in one pass; returns {sheet name: data rows written}."""
+    wb = Workbook(write_only=True)
+    counts = {name: write_sheet(wb, name, data) for name, data in sheets.items()}
+    wb.save(path)
+    return counts
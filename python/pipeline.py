@@ -0,0 +1,126 @@
+"""
+Small dependency-aware job runner for the report (fetch -> render -> export).
+
+Every chart / sheet is a job with explicit data dependencies. A job runs as
+soon as all of its dependencies are done:
+- "fetch" jobs run on a bounded thread pool (DB I/O releases the GIL)
+- "render" and "export" jobs run on a process pool (matplotlib Agg, Plotly
+  serialization and openpyxl are CPU-bound), so functions and arguments
+  must be picklable module-level objects
+
+A dependency is either a job name (the whole result is passed) or a
+(job name, key) pair (result[key] is passed), which lets one batch fetch
+feed many per-event renders. Results are passed positionally, in `deps`
+order, before the job's own args.
+
+Environment overrides (optional):
+  PIPELINE_FETCH_WORKERS=4
+  PIPELINE_RENDER_WORKERS=<cpu count>
+"""
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Job:
+    name: str
+    fn: object
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    deps: tuple = ()
+    stage: str = "fetch"
+
+
+def _dep_name(dep):
+    return dep[0] if isinstance(dep, tuple) else dep
+
+
+def _timed(fn, args, kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, t0, time.perf_counter()
+
+
+class Pipeline:
+    def __init__(self, fetch_workers=None, render_workers=None):
+        self.fetch_workers = fetch_workers or int(os.getenv("PIPELINE_FETCH_WORKERS", "4"))
+        self.render_workers = render_workers or int(os.getenv("PIPELINE_RENDER_WORKERS", str(os.cpu_count() or 2)))
+        self.jobs = {}
+        self.results = {}
+        self.timings = {}       # job name -> (stage, seconds)
+        self.errors = {}
+
+    def add(self, name, fn, *args, deps=(), stage="fetch", **kwargs):
+        if name in self.jobs: raise ValueError(f"duplicate job {name!r}")
+        if stage not in ("fetch", "render", "export"): raise ValueError(f"unknown stage {stage!r}")
+        self.jobs[name] = Job(name, fn, args, kwargs, tuple(deps), stage)
+        return name
+
+    def _check(self):
+        for job in self.jobs.values():
+            for dep in job.deps:
+                if _dep_name(dep) not in self.jobs:
+                    raise ValueError(f"job {job.name!r} depends on unknown job {_dep_name(dep)!r}")
+
+    def _inputs(self, job):
+        vals = []
+        for dep in job.deps:
+            if isinstance(dep, tuple): vals.append(self.results[dep[0]][dep[1]])
+            else: vals.append(self.results[dep])
+        return tuple(vals) + job.args
+
+    def run(self) -> dict:
+        self._check()
+        pending = dict(self.jobs)
+        running = {}
+        stage_span = {}
+        t_start = time.perf_counter()
+        threads = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="fetch")
+        procs = ProcessPoolExecutor(max_workers=self.render_workers, mp_context=mp.get_context("spawn"))
+        try:
+            while pending or running:
+                for name, job in list(pending.items()):
+                    deps = {_dep_name(d) for d in job.deps}
+                    if deps & set(self.errors):
+                        self.errors[name] = "skipped: upstream failed"; del pending[name]; continue
+                    if not deps <= set(self.results): continue
+                    pool = threads if job.stage == "fetch" else procs
+                    running[pool.submit(_timed, job.fn, self._inputs(job), job.kwargs)] = job
+                    del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job = running.pop(fut)
+                    try:
+                        result, t0, t1 = fut.result()
+                    except Exception as e:
+                        self.errors[job.name] = repr(e)
+                        print(f"[ERR] job {job.name}: {e}")
+                        continue
+                    self.results[job.name] = result
+                    self.timings[job.name] = (job.stage, t1 - t0)
+                    lo, hi = stage_span.get(job.stage, (t0, t1))
+                    stage_span[job.stage] = (min(lo, t0), max(hi, t1))
+            for name in pending: self.errors[name] = "not scheduled: dependency cycle"
+        finally:
+            threads.shutdown(wait=True); procs.shutdown(wait=True)
+        self.wall = time.perf_counter() - t_start
+        self.stage_span = {s: hi - lo for s, (lo, hi) in stage_span.items()}
+        return self.results
+
+    def report(self):
+        print(f"\n[pipeline] {len(self.timings)} jobs ok, {len(self.errors)} failed, wall={self.wall:.2f}s")
+        for stage in ("fetch", "render", "export"):
+            times = [t for s, t in self.timings.values() if s == stage]
+            if not times: continue
+            print(f"  {stage:<7} jobs={len(times):<3} sum={sum(times):7.2f}s "
+                  f"span={self.stage_span.get(stage, 0):7.2f}s slowest={max(times):6.2f}s")
+        for name, (stage, t) in sorted(self.timings.items(), key=lambda kv: -kv[1][1])[:5]:
+            print(f"  slow: {name:<40} {t:6.2f}s ({stage})")
+        for name, err in self.errors.items():
+            print(f"  fail: {name:<40} {err}")
@@ -0,0 +1,255 @@
+"""
+Opt-in hot-path profiling for the report (REPORT_PROFILE=1).
+
+`span(kind, label)` wraps one call of fetch_df / save_plot / save_html /
+export_to_excel and records wall time, CPU time (thread), rows, bytes and
+the tracemalloc peak above the call's starting point. Records are appended
+to a per-process JSONL file under PROFILE_DIR/<run id>, so renders that run
+in the pipeline's spawn workers are merged into the same report.
+
+`write_report(engine)` (main process, end of run) writes profile.json and
+profile.html, adds cProfile stats of the slowest items (PROFILE_CPROFILE=1)
+and EXPLAIN ANALYZE plans of the slowest catalog fetches
+(PROFILE_EXPLAIN=N), and optionally pushes the numbers to a Prometheus
+Pushgateway.
+
+Peaks are process-wide while the call runs, so they are approximate when
+fetch threads overlap. cProfile can only be active once per interpreter,
+so overlapping calls in other threads are simply not profiled.
+
+Environment overrides (optional):
+  REPORT_PROFILE=0
+  PROFILE_DIR=exports/profile
+  PROFILE_CPROFILE=0          (1 = run every span under cProfile; keep the slowest)
+  PROFILE_TOP=5               (slowest items with cProfile / EXPLAIN output)
+  PROFILE_EXPLAIN=0           (N slowest fetches to EXPLAIN ANALYZE)
+  PROFILE_PUSHGATEWAY=        (host:port, e.g. localhost:9091)
+"""
+
+import cProfile
+import html
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+ENABLED = os.getenv("REPORT_PROFILE", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("exports", "profile"))
+USE_CPROFILE = os.getenv("PROFILE_CPROFILE", "0") == "1"
+TOP = int(os.getenv("PROFILE_TOP", "5"))
+EXPLAIN = int(os.getenv("PROFILE_EXPLAIN", "0"))
+PUSHGATEWAY = os.getenv("PROFILE_PUSHGATEWAY", "")
+
+_lock = threading.Lock()
+_active = 0          # spans currently open in this process
+_cprofile_busy = False
+
+
+class Record(dict):
+    """One profiled call; the caller fills rows / bytes / extra fields."""
+
+    def __setattr__(self, k, v): self[k] = v
+    def __getattr__(self, k):
+        try: return self[k]
+        except KeyError: raise AttributeError(k)
+
+
+class _Off:
+    """Stand-in when profiling is disabled: attribute writes are dropped."""
+
+    def __setattr__(self, k, v): pass
+
+
+_OFF = _Off()
+
+
+def run_id() -> str:
+    """Shared by the main process and its spawn workers (inherited through the environment)."""
+    rid = os.environ.get("PROFILE_RUN")
+    if not rid:
+        rid = os.environ["PROFILE_RUN"] = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    return rid
+
+
+def _run_dir() -> str:
+    d = os.path.join(PROFILE_DIR, run_id())
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _save(rec: Record):
+    path = os.path.join(_run_dir(), f"records-{os.getpid()}.jsonl")
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(rec, default=str) + "\n")
+
+
+def _start_cprofile():
+    global _cprofile_busy
+    with _lock:
+        if _cprofile_busy: return None
+        _cprofile_busy = True
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:          # another profiler (debugger, coverage) is already active
+        with _lock: _cprofile_busy = False
+        return None
+    return prof
+
+
+def _stop_cprofile(prof) -> str:
+    global _cprofile_busy
+    prof.disable()
+    with _lock: _cprofile_busy = False
+    out = io.StringIO()
+    pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(25)
+    return out.getvalue()
+
+
+@contextmanager
+def span(kind: str, label: str, **fields):
+    """Profile the enclosed block; yields the record so the caller can set rows / bytes."""
+    global _active
+    if not ENABLED:
+        yield _OFF; return
+    if not tracemalloc.is_tracing(): tracemalloc.start()
+    with _lock:
+        if _active == 0: tracemalloc.reset_peak()
+        _active += 1
+    rec = Record(kind=kind, label=label, pid=os.getpid(), rows=None, bytes=None, error=None, **fields)
+    mem0 = tracemalloc.get_traced_memory()[0]
+    prof = _start_cprofile() if USE_CPROFILE else None
+    t0, c0 = time.perf_counter(), time.thread_time()
+    try:
+        yield rec
+    except Exception as e:
+        rec.error = repr(e)
+        raise
+    finally:
+        rec.wall_s = round(time.perf_counter() - t0, 6)
+        rec.cpu_s = round(time.thread_time() - c0, 6)
+        rec.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - mem0)
+        rec.started = round(time.time() - rec.wall_s, 3)
+        if prof is not None: rec.cprofile = _stop_cprofile(prof)
+        with _lock: _active -= 1
+        _save(rec)
+
+
+def frame_bytes(df) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def file_bytes(path: str):
+    try: return os.path.getsize(path)
+    except OSError: return None
+
+
+# -----------------
+# Report
+# -----------------
+def load_records() -> list:
+    d = _run_dir()
+    recs = []
+    for fn in sorted(os.listdir(d)):
+        if not fn.startswith("records-"): continue
+        with open(os.path.join(d, fn), encoding="utf-8") as f:
+            recs.extend(json.loads(line) for line in f if line.strip())
+    return sorted(recs, key=lambda r: r["started"])
+
+
+def summarize(recs: list) -> dict:
+    by_kind = {}
+    for r in recs:
+        s = by_kind.setdefault(r["kind"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0, "bytes": 0,
+                                           "max_peak_bytes": 0})
+        s["calls"] += 1; s["wall_s"] += r["wall_s"]; s["cpu_s"] += r["cpu_s"]
+        s["rows"] += r.get("rows") or 0; s["bytes"] += r.get("bytes") or 0
+        s["max_peak_bytes"] = max(s["max_peak_bytes"], r["peak_bytes"])
+    for s in by_kind.values():
+        s["wall_s"] = round(s["wall_s"], 3); s["cpu_s"] = round(s["cpu_s"], 3)
+    return by_kind
+
+
+def _explain_slowest(engine, recs: list) -> dict:
+    import query_catalog as catalog
+    plans = {}
+    fetches = sorted((r for r in recs if r["kind"] == "fetch" and r.get("query")), key=lambda r: -r["wall_s"])
+    for r in fetches[:EXPLAIN]:
+        key = f"{r['query']} {json.dumps(r.get('params'), default=str)}"
+        if key in plans: continue
+        try: plans[key] = catalog.explain(engine, r["query"], r.get("params"))
+        except Exception as e: plans[key] = f"EXPLAIN failed: {e}"
+    return plans
+
+
+def _html(profile: dict) -> str:
+    esc = lambda v: html.escape("" if v is None else str(v))
+    rows = "".join(
+        f"<tr><td>{esc(r['kind'])}</td><td>{esc(r['label'])}</td><td>{r['wall_s']:.3f}</td>"
+        f"<td>{r['cpu_s']:.3f}</td><td>{esc(r.get('rows'))}</td><td>{esc(r.get('bytes'))}</td>"
+        f"<td>{r['peak_bytes']}</td><td>{r['pid']}</td><td>{esc(r.get('error'))}</td></tr>"
+        for r in sorted(profile["records"], key=lambda r: -r["wall_s"]))
+    kinds = "".join(f"<tr><td>{esc(k)}</td>" + "".join(f"<td>{v}</td>" for v in s.values()) + "</tr>"
+                    for k, s in profile["summary"].items())
+    pre = lambda title, d: "".join(f"<h3>{esc(title)}: {esc(k)}</h3><pre>{esc(v)}</pre>" for k, v in d.items())
+    return f"""<!doctype html><html><head><meta charset="utf-8"><title>Report profile {esc(profile['run'])}</title>
+<style>body{{font-family:sans-serif}}td,th{{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}}
+td:nth-child(2){{text-align:left}}pre{{background:#f6f6f6;padding:8px;overflow:auto}}</style></head><body>
+<h1>Report profile {esc(profile['run'])}</h1><p>wall {profile['wall_s']:.2f}s, {len(profile['records'])} calls</p>
+<h2>By kind</h2><table><tr><th>kind</th><th>calls</th><th>wall s</th><th>cpu s</th><th>rows</th><th>bytes</th>
+<th>max peak bytes</th></tr>{kinds}</table>
+<h2>Calls (slowest first)</h2><table><tr><th>kind</th><th>label</th><th>wall s</th><th>cpu s</th><th>rows</th>
+<th>bytes</th><th>peak bytes</th><th>pid</th><th>error</th></tr>{rows}</table>
+{pre("cProfile", profile["cprofile"])}{pre("EXPLAIN ANALYZE", profile["explain"])}</body></html>"""
+
+
+def push_metrics(profile: dict):
+    from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+    reg = CollectorRegistry()
+    g_run = Gauge("report_run_seconds", "Wall time of the whole report run", registry=reg)
+    g_wall = Gauge("report_stage_seconds", "Summed wall time per kind", ["kind"], registry=reg)
+    g_cpu = Gauge("report_stage_cpu_seconds", "Summed CPU time per kind", ["kind"], registry=reg)
+    g_calls = Gauge("report_stage_calls", "Calls per kind", ["kind"], registry=reg)
+    g_peak = Gauge("report_stage_peak_bytes", "Largest traced-memory peak per kind", ["kind"], registry=reg)
+    g_item = Gauge("report_item_seconds", "Wall time per profiled call", ["kind", "label"], registry=reg)
+    g_run.set(profile["wall_s"])
+    for kind, s in profile["summary"].items():
+        g_wall.labels(kind).set(s["wall_s"]); g_cpu.labels(kind).set(s["cpu_s"])
+        g_calls.labels(kind).set(s["calls"]); g_peak.labels(kind).set(s["max_peak_bytes"])
+    for r in profile["records"]:
+        g_item.labels(r["kind"], r["label"]).set(r["wall_s"])
+    push_to_gateway(PUSHGATEWAY, job="csgo_report", registry=reg)
+
+
+def write_report(engine=None, wall_s=None):
+    """Merge every process' records for this run and write profile.json / profile.html."""
+    if not ENABLED: return None
+    recs = load_records()
+    if not recs: return None
+    slow = sorted(recs, key=lambda r: -r["wall_s"])[:TOP]
+    profile = {
+        "run": run_id(),
+        "wall_s": wall_s if wall_s is not None else max(r["started"] + r["wall_s"] for r in recs) - recs[0]["started"],
+        "summary": summarize(recs),
+        "records": [{k: v for k, v in r.items() if k != "cprofile"} for r in recs],
+        "cprofile": {f"{r['kind']}:{r['label']}": r["cprofile"] for r in slow if r.get("cprofile")},
+        "explain": _explain_slowest(engine, recs) if engine is not None and EXPLAIN else {},
+    }
+    d = _run_dir()
+    with open(os.path.join(d, "profile.json"), "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, default=str)
+    with open(os.path.join(d, "profile.html"), "w", encoding="utf-8") as f:
+        f.write(_html(profile))
+    print(f"[OK] profile: {len(recs)} calls -> {d}/profile.html")
+    for kind, s in profile["summary"].items():
+        print(f"  {kind:<7} calls={s['calls']:<4} wall={s['wall_s']:7.2f}s cpu={s['cpu_s']:7.2f}s "
+              f"rows={s['rows']:<8} peak={s['max_peak_bytes'] / 1_048_576:.1f}MB")
+    if PUSHGATEWAY:
+        try: push_metrics(profile); print(f"[OK] profile pushed to {PUSHGATEWAY}")
+        except Exception as e: print(f"[WARN] pushgateway: {e}")
+    return profile
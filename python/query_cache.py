@@ -0,0 +1,139 @@
+"""
+Query-result cache used behind analytics.fetch_df.
+
+Two tiers:
+- in-memory LRU (bounded by entry count)
+- optional on-disk tier with pickled DataFrames (one file per key)
+
+Entries expire after a TTL and are dropped as soon as the data watermark
+(e.g. max(match_id) for the queried event) moves. The watermark itself is
+re-checked at most once per `watermark_ttl` seconds per scope, so a burst of
+report queries costs one cheap lookup instead of one full query each.
+
+Environment overrides (optional):
+  QUERY_CACHE=1              (0 disables the cache)
+  QUERY_CACHE_SIZE=128       (max in-memory entries)
+  QUERY_CACHE_TTL=600        (seconds)
+  QUERY_CACHE_DIR=           (enables the disk tier, e.g. .cache/queries)
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and drop the trailing ';' so formatting does not split keys."""
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+
+def make_key(sql: str, params=None) -> str:
+    items = sorted((params or {}).items())
+    raw = normalize_sql(sql) + "|" + repr(items)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    def __init__(self, max_entries=128, ttl=600.0, disk_dir=None,
+                 watermark=None, watermark_ttl=5.0, scope_of=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.watermark = watermark          # callable(scope) -> comparable value
+        self.scope_of = scope_of or (lambda params: params.get("event_id"))
+        self.watermark_ttl = watermark_ttl
+        self._mem = OrderedDict()           # key -> (created_at, watermark, df)
+        self._marks = {}                    # scope -> (checked_at, value)
+        self._lock = threading.RLock()
+        self.hits = self.misses = 0
+        if disk_dir: os.makedirs(disk_dir, exist_ok=True)
+
+    # --- watermark ---
+    def _current_mark(self, params):
+        if self.watermark is None: return None
+        scope = self.scope_of(params)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._marks.get(scope)
+            if cached and now - cached[0] < self.watermark_ttl: return cached[1]
+        value = self.watermark(scope)
+        with self._lock: self._marks[scope] = (now, value)
+        return value
+
+    # --- tiers ---
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_dir: return None
+        try:
+            with open(self._disk_path(key), "rb") as f: return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir: return
+        path = self._disk_path(key); tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f: pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError as e:
+            # disk full / read-only / permissions: the result is still served from memory
+            print(f"[WARN] query cache disk write failed: {e}")
+            try: os.remove(tmp)
+            except OSError: pass
+
+    def _fresh(self, entry, mark):
+        created_at, entry_mark, _ = entry
+        return time.time() - created_at < self.ttl and entry_mark == mark
+
+    def _put_mem(self, key, entry):
+        self._mem[key] = entry; self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries: self._mem.popitem(last=False)
+
+    # --- public API ---
+    def get_or_load(self, sql: str, params, loader):
+        params = params or {}
+        key = make_key(sql, params)
+        mark = self._current_mark(params)
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None and self._fresh(entry, mark):
+                self._mem.move_to_end(key); self.hits += 1
+                return entry[2].copy()
+            self._mem.pop(key, None)
+        entry = self._read_disk(key)
+        if entry is not None and self._fresh(entry, mark):
+            with self._lock: self._put_mem(key, entry); self.hits += 1
+            return entry[2].copy()
+        df = loader(sql, params)
+        entry = (time.time(), mark, df)
+        with self._lock: self._put_mem(key, entry); self.misses += 1
+        self._write_disk(key, entry)
+        return df.copy()
+
+    def invalidate(self):
+        """Drop every entry (both tiers) and forget known watermarks."""
+        with self._lock:
+            self._mem.clear(); self._marks.clear()
+        if self.disk_dir:
+            for fn in os.listdir(self.disk_dir):
+                if fn.endswith(".pkl"): os.remove(os.path.join(self.disk_dir, fn))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._mem), "hits": self.hits, "misses": self.misses}
+
+
+def cache_from_env(watermark=None):
+    if os.getenv("QUERY_CACHE", "1") == "0": return None
+    return QueryCache(
+        max_entries=int(os.getenv("QUERY_CACHE_SIZE", "128")),
+        ttl=float(os.getenv("QUERY_CACHE_TTL", "600")),
+        disk_dir=os.getenv("QUERY_CACHE_DIR") or None,
+        watermark=watermark,
+    )